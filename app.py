@@ -1,38 +1,86 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
-import json, uuid, datetime, os
-from rule_engine import eval_expr
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
+from fastapi.responses import Response
+import ast, json, uuid, datetime, os, hashlib
+from collections import OrderedDict
+import orjson
+from rule_engine import compile_rule, parse_rule
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+REPORT_CACHE_SIZE = 256
+REPORTS_DIR = os.path.abspath('reports')
 
 app = FastAPI()
-with open('ruleset.json') as f:
-    RULES = json.load(f)
+os.makedirs(REPORTS_DIR, exist_ok=True)
+with open('ruleset.json', 'rb') as f:
+    RULES = orjson.loads(f.read())
+
+def _invalid_rule(exc):
+    def fn(context):
+        raise exc
+    return fn
+
+for r in RULES:
+    r['_ast'] = None
+    try:
+        r['_ast'] = parse_rule(r['rule'])
+        r['_fn'] = compile_rule(r['_ast'])
+    except (SyntaxError, TypeError) as e:
+        r['_fn'] = _invalid_rule(e)  # reported as ERROR per request, as before
+
+# check ids that any rule reads; other checks are dropped when building the context
+REFERENCED = set()
+for r in RULES:
+    if r['_ast'] is not None:
+        REFERENCED.update(n.id for n in ast.walk(r['_ast']) if isinstance(n, ast.Name))
+
+N_RULES = len(RULES)
+_RULE_TUPLES = [(r['control_id'], r['_fn'], r['rule']) for r in RULES]
+
+def _persist(report, path):
+    with open(path,'wb') as f:
+        f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+
+# sha256 of upload body -> report, so an identical re-upload returns the prior report
+_report_cache = OrderedDict()
 
 def build_context(checks):
-    ctx = {}
-    for c in checks:
-        cid = c.get('id'); ctx[cid] = c.get('value')
-    return ctx
+    return {c['id']: c.get('value') for c in checks if c.get('id') in REFERENCED}
 
 @app.post('/upload-file')
-async def upload_file(file: UploadFile = File(...)):
-    contents = await file.read()
+async def upload_file(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(413, 'File too large')
+    contents = await file.read(MAX_UPLOAD_BYTES + 1)
+    if len(contents) > MAX_UPLOAD_BYTES:
+        raise HTTPException(413, 'File too large')
+    key = hashlib.sha256(contents).digest()
+    report = _report_cache.get(key)
+    if report is not None:
+        _report_cache.move_to_end(key)
+        return Response(orjson.dumps(report), media_type='application/json')
     try:
-        payload = json.loads(contents)
-    except Exception:
-        raise HTTPException(400, 'Invalid JSON')
+        payload = orjson.loads(contents)
+    except orjson.JSONDecodeError:
+        # stdlib json also takes BOM/UTF-16/UTF-32 bodies and NaN/Infinity literals
+        try:
+            payload = json.loads(contents)
+        except Exception:
+            raise HTTPException(400, 'Invalid JSON')
+    del contents
     context = build_context(payload.get('checks', []))
     results=[]; passed=0
-    for rule in RULES:
+    for cid, fn, expr in _RULE_TUPLES:
         try:
-            ok = eval_expr(rule['rule'], context)
+            ok = fn(context)
             status = 'PASS' if ok else 'FAIL'
         except Exception:
             status = 'ERROR'
         if status=='PASS': passed +=1
-        results.append({'control':rule['control_id'],'status':status,'rule':rule['rule']})
-    score = int((passed/len(RULES))*100)
+        results.append({'control':cid,'status':status,'rule':expr})
+    score = passed * 100 // N_RULES
     report = {'report_id':str(uuid.uuid4()),'asset':payload.get('asset_id'),'score':score,'details':results,'timestamp':datetime.datetime.utcnow().isoformat()+'Z'}
-    os.makedirs('reports', exist_ok=True)
-    with open(os.path.join('reports',report['report_id']+'.json'),'w') as f:
-        json.dump(report,f,indent=2)
-    return JSONResponse(report)
+    _report_cache[key] = report
+    if len(_report_cache) > REPORT_CACHE_SIZE:
+        _report_cache.popitem(last=False)
+    background_tasks.add_task(_persist, report, os.path.join(REPORTS_DIR, report['report_id']+'.json'))
+    return Response(orjson.dumps(report), media_type='application/json', background=background_tasks)
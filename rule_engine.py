@@ -1,4 +1,5 @@
 import ast, operator as op
+from functools import lru_cache
 
 OPERATORS = {
     ast.Eq: op.eq,
@@ -7,27 +8,43 @@ OPERATORS = {
     ast.LtE: op.le,
     ast.Gt: op.gt,
     ast.GtE: op.ge,
-    ast.And: lambda a, b: a and b,
-    ast.Or: lambda a, b: a or b,
 }
 
+def _unsupported(a, b):
+    raise TypeError('Unsupported expression')
+
+def _op_funcs(node):
+    # resolved once per Compare node and kept on it; parse_rule shares nodes across calls
+    funcs = getattr(node, '_op_funcs', None)
+    if funcs is None:
+        funcs = node._op_funcs = tuple(OPERATORS.get(type(o), _unsupported) for o in node.ops)
+    return funcs
+
+@lru_cache(maxsize=1024)
+def parse_rule(expr):
+    """Parse a rule expression to its AST body; repeated expressions share one parse."""
+    return ast.parse(expr, mode='eval').body
+
 def eval_expr(expr, context):
-    node = ast.parse(expr, mode='eval')
-    return _eval(node.body, context)
+    return eval_ast(parse_rule(expr), context)
 
-def _eval(node, context):
+def eval_ast(node, context):
     if isinstance(node, ast.BoolOp):
-        left = _eval(node.values[0], context)
-        for val in node.values[1:]:
-            right = _eval(val, context)
-            op_func = OPERATORS[type(node.op)]
-            left = op_func(left, right)
-        return left
+        if isinstance(node.op, ast.And):
+            for val in node.values:
+                r = eval_ast(val, context)
+                if not r:
+                    return r
+            return r
+        for val in node.values:
+            r = eval_ast(val, context)
+            if r:
+                return r
+        return r
     elif isinstance(node, ast.Compare):
-        left = _eval(node.left, context)
-        for op_node, comparator in zip(node.ops, node.comparators):
-            right = _eval(comparator, context)
-            op_func = OPERATORS[type(op_node)]
+        left = eval_ast(node.left, context)
+        for op_func, comparator in zip(_op_funcs(node), node.comparators):
+            right = eval_ast(comparator, context)
             if not op_func(left, right):
                 return False
             left = right
@@ -38,3 +55,52 @@ def _eval(node, context):
         return node.value
     else:
         raise TypeError('Unsupported expression')
+
+def compile_rule(node):
+    """Compile a rule AST into a callable taking the context dict."""
+    if isinstance(node, ast.Compare) and len(node.ops) == 1 \
+            and isinstance(node.left, ast.Name) and isinstance(node.comparators[0], ast.Constant):
+        # fast path for the common `NAME <op> constant` rule
+        return lambda c, k=node.left.id, v=node.comparators[0].value, f=_op_funcs(node)[0]: f(c.get(k), v)
+    if isinstance(node, ast.BoolOp):
+        fns = tuple(compile_rule(v) for v in node.values)
+        if len(fns) == 2:
+            if isinstance(node.op, ast.And):
+                return lambda c, a=fns[0], b=fns[1]: a(c) and b(c)
+            return lambda c, a=fns[0], b=fns[1]: a(c) or b(c)
+        if isinstance(node.op, ast.And):
+            def bool_and(c, fns=fns):
+                for fn in fns:
+                    r = fn(c)
+                    if not r:
+                        return r
+                return r
+            return bool_and
+        def bool_or(c, fns=fns):
+            for fn in fns:
+                r = fn(c)
+                if r:
+                    return r
+            return r
+        return bool_or
+    elif isinstance(node, ast.Compare):
+        L = compile_rule(node.left)
+        funcs = _op_funcs(node)
+        if len(funcs) == 1:
+            return lambda c, L=L, R=compile_rule(node.comparators[0]), f=funcs[0]: f(L(c), R(c))
+        pairs = tuple((f, compile_rule(cmp)) for f, cmp in zip(funcs, node.comparators))
+        def compare_chain(c, L=L, pairs=pairs):
+            left = L(c)
+            for f, R in pairs:
+                right = R(c)
+                if not f(left, right):
+                    return False
+                left = right
+            return True
+        return compare_chain
+    elif isinstance(node, ast.Name):
+        return lambda c, k=node.id: c.get(k)
+    elif isinstance(node, ast.Constant):
+        return lambda c, v=node.value: v
+    else:
+        raise TypeError('Unsupported expression')
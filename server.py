@@ -0,0 +1,10 @@
+import importlib.util
+import os
+import uvicorn
+
+# uvloop has no Windows build; fall back to uvicorn's default loop there
+LOOP = 'uvloop' if importlib.util.find_spec('uvloop') else 'auto'
+
+if __name__ == '__main__':
+    uvicorn.run('app:app', host=os.environ.get('HOST', '0.0.0.0'), port=int(os.environ.get('PORT', 8000)),
+                loop=LOOP, http='httptools', workers=os.cpu_count())
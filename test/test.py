@@ -1,10 +1,12 @@
 # compliance_full_report.py
 import os
-import json
+import operator
+import orjson
 from datetime import datetime
 import numpy as np
-import pandas as pd
+import xlsxwriter
 import matplotlib.pyplot as plt
+import seaborn as sns
 from reportlab.lib.pagesizes import landscape, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet
@@ -174,79 +176,106 @@ company_data = {
 # =========================
 # 3) EVALUATOR
 # =========================
-def get_field_value(data, field_path):
-    parts = field_path.split(".")
-    v = data
-    try:
-        for p in parts:
-            if isinstance(v, dict):
-                v = v.get(p, None)
-            else:
-                return None
-        return v
-    except Exception:
-        return None
+def make_getter(parts):
+    # nested .get closures per key, so dotted paths are split once at load time
+    head, rest = parts[0], parts[1:]
+    if not rest:
+        return lambda d: d.get(head) if isinstance(d, dict) else None
+    inner = make_getter(rest)
+    return lambda d: inner(d.get(head)) if isinstance(d, dict) else None
 
-def evaluate_rule(rule, data):
-    field = rule["field"]
-    op = rule["op"]
-    expected = rule["value"]
-    weight = rule.get("weight", 1)
-    actual = get_field_value(data, field)
-    if actual is None:
-        return 0, "WARNING", f"Missing field {field}"
-    try:
-        if op == "==":
-            if actual == expected:
-                return weight, "PASS", ""
-            else:
-                return 0, "FAIL", f"Expected {expected}, got {actual}"
-        if op == ">=":
-            if actual >= expected:
-                return weight, "PASS", ""
-            else:
-                return 0, "FAIL", f"Expected >= {expected}, got {actual}"
-        if op == "<=":
-            if actual <= expected:
-                return weight, "PASS", ""
-            else:
-                return 0, "FAIL", f"Expected <= {expected}, got {actual}"
-        if op == "not_contains":
-            if isinstance(actual, list):
-                if expected not in actual:
-                    return weight, "PASS", ""
-                else:
-                    return 0, "FAIL", f"Value {expected} present in list"
+def object_array(values):
+    # element-wise fill so list values (e.g. open_ports) stay scalars of the array
+    arr = np.empty(len(values), dtype=object)
+    for i, v in enumerate(values):
+        arr[i] = v
+    return arr
+
+# Rules flattened to a structure-of-arrays once, so each company is scored with
+# one vectorized comparison per operator instead of a Python branch per rule.
+OP_EQ, OP_GE, OP_LE, OP_NOT_CONTAINS, OP_UNSUPPORTED = range(5)
+OP_MAP = {"==": OP_EQ, ">=": OP_GE, "<=": OP_LE, "not_contains": OP_NOT_CONTAINS}
+OP_UFUNCS = {OP_EQ: np.equal, OP_GE: np.greater_equal, OP_LE: np.less_equal}
+OP_FUNCS = {OP_EQ: operator.eq, OP_GE: operator.ge, OP_LE: operator.le}
+FAIL_MESSAGES = {OP_EQ: "Expected {}, got {}", OP_GE: "Expected >= {}, got {}", OP_LE: "Expected <= {}, got {}"}
+
+field_getters = [make_getter(tuple(r["field"].split("."))) for r in rules]
+op_codes = np.array([OP_MAP.get(r["op"], OP_UNSUPPORTED) for r in rules])
+expected = object_array([r["value"] for r in rules])
+weights = np.array([r.get("weight", 1) for r in rules])
+
+def evaluate_rules(data):
+    """Evaluate every rule against one company; returns (pass_mask, statuses, messages)."""
+    n = len(rules)
+    actuals = object_array([g(data) for g in field_getters])
+    missing = np.fromiter((a is None for a in actuals), dtype=bool, count=n)
+    pass_mask = np.zeros(n, dtype=bool)
+    errors = {}
+    for code, ufunc in OP_UFUNCS.items():
+        idx = np.flatnonzero((op_codes == code) & ~missing)
+        if idx.size == 0:
+            continue
+        try:
+            pass_mask[idx] = ufunc(actuals[idx], expected[idx]).astype(bool)
+        except Exception:
+            # retry one by one so a single bad comparison only errors its own rule
+            for i in idx:
+                try:
+                    pass_mask[i] = bool(OP_FUNCS[code](actuals[i], expected[i]))
+                except Exception as e:
+                    errors[i] = str(e)
+
+    statuses, messages = [], []
+    for i, r in enumerate(rules):
+        code = op_codes[i]
+        actual = actuals[i]
+        if missing[i]:
+            status, msg = "WARNING", f"Missing field {r['field']}"
+        elif i in errors:
+            status, msg = "ERROR", errors[i]
+        elif code == OP_NOT_CONTAINS:
+            if not isinstance(actual, list):
+                status, msg = "WARNING", f"Field {r['field']} not a list"
+            elif expected[i] in actual:
+                status, msg = "FAIL", f"Value {expected[i]} present in list"
             else:
-                return 0, "WARNING", f"Field {field} not a list"
-        return 0, "WARNING", f"Unsupported op {op}"
-    except Exception as e:
-        return 0, "ERROR", str(e)
+                pass_mask[i] = True
+                status, msg = "PASS", ""
+        elif code == OP_UNSUPPORTED:
+            status, msg = "WARNING", f"Unsupported op {r['op']}"
+        elif pass_mask[i]:
+            status, msg = "PASS", ""
+        else:
+            status, msg = "FAIL", FAIL_MESSAGES[code].format(expected[i], actual)
+        statuses.append(status)
+        messages.append(msg)
+    return pass_mask, statuses, messages
 
-def evaluate_company(data, rules):
-    frameworks = {}
-    for r in rules:
-        fw = r["framework"]
-        frameworks.setdefault(fw, {"rules": [], "total_weight": 0})
-        frameworks[fw]["rules"].append(r)
-        frameworks[fw]["total_weight"] += r.get("weight",1)
+# Framework grouping depends only on the rules, so it is built once for all companies
+FRAMEWORKS = {}
+for i, r in enumerate(rules):
+    fw = r["framework"]
+    FRAMEWORKS.setdefault(fw, {"idx": [], "total_weight": 0})
+    FRAMEWORKS[fw]["idx"].append(i)
+    FRAMEWORKS[fw]["total_weight"] += r.get("weight",1)
+for meta in FRAMEWORKS.values():
+    meta["idx"] = np.array(meta["idx"])
 
+def evaluate_company(data):
+    pass_mask, statuses, messages = evaluate_rules(data)
     fw_results = {}
-    for fw, meta in frameworks.items():
+    for fw, meta in FRAMEWORKS.items():
         total_weight = meta["total_weight"]
-        score = 0
-        details = []
-        for r in meta["rules"]:
-            weight, status, msg = evaluate_rule(r, data)
-            # add score only when PASS
-            score += weight
-            details.append({
-                "rule_id": r["id"],
-                "description": r["description"],
-                "status": status,
-                "message": msg,
-                "remediation": r.get("remediation","")
-            })
+        idx = meta["idx"]
+        # add score only when PASS
+        score = int(weights[idx][pass_mask[idx]].sum())
+        details = [{
+            "rule_id": rules[i]["id"],
+            "description": rules[i]["description"],
+            "status": statuses[i],
+            "message": messages[i],
+            "remediation": rules[i].get("remediation","")
+        } for i in idx]
         pct = round((score/total_weight)*100,2) if total_weight>0 else 0.0
         fw_results[fw] = {"compliance_pct": pct, "total_weight": total_weight, "score_weight": score, "details": details}
     return fw_results
@@ -256,14 +285,14 @@ def evaluate_company(data, rules):
 # =========================
 all_results = {}
 for company, data in company_data.items():
-    all_results[company] = evaluate_company(data, rules)
+    all_results[company] = evaluate_company(data)
 
 # Save JSON results
 os.makedirs("compliance_output", exist_ok=True)
 timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
 json_out = os.path.join("compliance_output", f"compliance_results_{timestamp}.json")
-with open(json_out, "w") as f:
-    json.dump(all_results, f, indent=2)
+with open(json_out, "wb") as f:
+    f.write(orjson.dumps(all_results, option=orjson.OPT_INDENT_2))
 
 # =========================
 # 5) BUILD HEATMAP (frameworks x companies)
@@ -277,55 +306,52 @@ for i, fw in enumerate(frameworks_sorted):
 
 # Plot heatmap and save image
 plt.figure(figsize=(10,6))
-im = plt.imshow(heatmap, cmap="RdYlGn", vmin=0, vmax=100, aspect='auto')
-plt.xticks(np.arange(len(companies_sorted)), companies_sorted)
-plt.yticks(np.arange(len(frameworks_sorted)), frameworks_sorted)
-for i in range(len(frameworks_sorted)):
-    for j in range(len(companies_sorted)):
-        plt.text(j, i, f"{heatmap[i,j]:.1f}%", ha="center", va="center", color="black", fontsize=10)
-plt.colorbar(im, label="Compliance %")
+sns.heatmap(heatmap, annot=np.char.mod("%.1f%%", heatmap), fmt="", cmap="RdYlGn", vmin=0, vmax=100,
+            xticklabels=companies_sorted, yticklabels=frameworks_sorted,
+            annot_kws={"color": "black", "fontsize": 10}, cbar_kws={"label": "Compliance %"})
+plt.yticks(rotation=0)
 plt.title("Compliance % Heatmap (Frameworks vs Companies)")
 plt.xlabel("Company")
 plt.ylabel("Framework")
 plt.tight_layout()
 heatmap_png = os.path.join("compliance_output", f"compliance_heatmap_{timestamp}.png")
-plt.savefig(heatmap_png, dpi=200)
+plt.savefig(heatmap_png, dpi=100)
 plt.close()
 
 # =========================
 # 6) GENERATE DETAILED TABLE (Excel) and flattened CSV for per-rule view
 # =========================
-rows = []
+# Rows are streamed straight into xlsxwriter (constant memory) while walking all_results
+RULE_COLUMNS = ["company", "framework", "rule_id", "description", "status", "message", "remediation"]
+SUMMARY_COLUMNS = ["company", "framework", "compliance_pct", "total_weight", "score_weight"]
+fail_rows = []
+excel_path = os.path.join("compliance_output", f"compliance_detailed_{timestamp}.xlsx")
+wb = xlsxwriter.Workbook(excel_path, {"constant_memory": True})
+header_fmt = wb.add_format({"bold": True, "border": 1, "align": "center"})
+ws = wb.add_worksheet()
+ws.write_row(0, 0, RULE_COLUMNS, header_fmt)
+row = 1
 for company, fwdata in all_results.items():
     for fw, vals in fwdata.items():
         for d in vals["details"]:
-            rows.append({
-                "company": company,
-                "framework": fw,
-                "rule_id": d["rule_id"],
-                "description": d["description"],
-                "status": d["status"],
-                "message": d["message"],
-                "remediation": d["remediation"]
-            })
-df_rules = pd.DataFrame(rows)
-excel_path = os.path.join("compliance_output", f"compliance_detailed_{timestamp}.xlsx")
-df_rules.to_excel(excel_path, index=False)
+            ws.write_row(row, 0, [company, fw, d["rule_id"], d["description"], d["status"], d["message"], d["remediation"]])
+            row += 1
+            if d["status"] != "PASS":
+                fail_rows.append({"framework": fw, **d})
+wb.close()
 
 # Also save a summary Excel
-summary_rows = []
+summary_excel = os.path.join("compliance_output", f"compliance_summary_{timestamp}.xlsx")
+wb = xlsxwriter.Workbook(summary_excel, {"constant_memory": True})
+header_fmt = wb.add_format({"bold": True, "border": 1, "align": "center"})
+ws = wb.add_worksheet()
+ws.write_row(0, 0, SUMMARY_COLUMNS, header_fmt)
+row = 1
 for company, fwdata in all_results.items():
     for fw, vals in fwdata.items():
-        summary_rows.append({
-            "company": company,
-            "framework": fw,
-            "compliance_pct": vals["compliance_pct"],
-            "total_weight": vals["total_weight"],
-            "score_weight": vals["score_weight"]
-        })
-df_summary = pd.DataFrame(summary_rows)
-summary_excel = os.path.join("compliance_output", f"compliance_summary_{timestamp}.xlsx")
-df_summary.to_excel(summary_excel, index=False)
+        ws.write_row(row, 0, [company, fw, vals["compliance_pct"], vals["total_weight"], vals["score_weight"]])
+        row += 1
+wb.close()
 
 # =========================
 # 7) CREATE PDF (one-page summary + heatmap + remediation list)
@@ -370,11 +396,10 @@ story.append(Spacer(1,12))
 # Add remediation list (top 15 non-compliant items by severity approximate via weight)
 story.append(Paragraph("<b>Top Non-Compliant Rules & Remediations</b>", styles["Heading3"]))
 # Build a prioritized remediation list: count fails and show remediations
-fail_rows = df_rules[df_rules["status"] != "PASS"].copy()
 # Simple prioritization: we show all fails; sort by framework then rule_id (you could refine)
-fail_rows = fail_rows.sort_values(["framework","rule_id"]).head(20)
+fail_rows = sorted(fail_rows, key=lambda r: (r["framework"], r["rule_id"]))[:20]
 
-for _, r in fail_rows.iterrows():
+for r in fail_rows:
     story.append(Paragraph(f"<b>[{r['framework']}] {r['rule_id']}</b> — {r['description']}", styles["Normal"]))
     story.append(Paragraph(f"Remediation: {r['remediation']}", styles["Italic"]))
     story.append(Spacer(1,6))
@@ -392,4 +417,6 @@ print("Detailed Excel: ", excel_path)
 print("Summary Excel:  ", summary_excel)
 print("PDF report:    ", pdf_path)
 print("\nQuick summary (framework % per company):")
-print(df_summary.pivot(index="company", columns="framework", values="compliance_pct").fillna(0))
+print(f"{'company':<12}" + "".join(f"{fw:>10}" for fw in frameworks_sorted))
+for comp in companies_sorted:
+    print(f"{comp:<12}" + "".join(f"{all_results[comp][fw]['compliance_pct']:>10.2f}" for fw in frameworks_sorted))